@@ -12,7 +12,6 @@ class AudioCategory(models.Model):
 
     name = fields.Char(
         required=True,
-        translate=True,
     )
 
     sequence = fields.Integer(default=10)
@@ -26,9 +25,25 @@ class AudioCategory(models.Model):
         inverse_name='category_id',
     )
 
-    task_count = fields.Integer(compute='_compute_task_count')
+    task_count = fields.Integer(
+        compute='_compute_task_count',
+        compute_sudo=True,
+    )
 
     def _compute_task_count(self):
-        """Compute the number of tasks in each category."""
+        """Compute the number of tasks in each category.
+
+        Uses one grouped query instead of reading the One2many of every
+        category.
+        """
+        data = self.env['audio.task'].read_group(
+            [('category_id', 'in', self.ids)],
+            ['category_id'],
+            ['category_id'],
+        )
+        counts = {
+            group['category_id'][0]: group['category_id_count']
+            for group in data
+        }
         for record in self:
-            record.task_count = len(record.task_ids)
+            record.task_count = counts.get(record.id, 0)
@@ -12,7 +12,7 @@ class AudioTag(models.Model):
 
     name = fields.Char(
         required=True,
-        translate=True,
+        index=True,
     )
 
     color = fields.Integer()
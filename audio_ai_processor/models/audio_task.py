@@ -1,14 +1,24 @@
 """Audio task model for managing audio transcription tasks."""
 
 import base64
+import concurrent.futures
+import functools
+import hashlib
+import itertools
 import logging
+import os
+import queue
+import random
 import threading
 import time
-from datetime import datetime
+
+from psycopg2 import errors as pg_errors
 
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError
+from odoo.tools import ormcache, sql, str2bool
 
+from ..services.audio_utils import normalize_audio, sniff_audio_format
 from ..services.env_utils import new_environment
 from ..services.whisper_service import WhisperService
 
@@ -16,6 +26,121 @@ _logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 3
 RETRY_DELAY = 0.5
+MAX_CONCURRENT_BATCHES = 2
+DEFAULT_BATCH_SIZE = 8
+
+# Limits the number of transcription batches running at once; replaces
+# the old one-task-at-a-time gate on the 'transcribing' state.
+_batch_slots = threading.BoundedSemaphore(MAX_CONCURRENT_BATCHES)
+
+# Wake-up queue for immediate mode. Each entry is a database name; a
+# single long-lived consumer thread drains pending tasks as soon as
+# they are queued, without waiting for the next cron tick. The cron
+# stays active as a safety net for tasks queued before a restart.
+_task_queue = queue.Queue()
+_queue_worker_started = False
+_queue_worker_lock = threading.Lock()
+
+
+def _queue_worker_loop():
+    """Consume queue wake-ups and process pending tasks."""
+    while True:
+        dbname = _task_queue.get()
+        try:
+            with new_environment(dbname) as env:
+                env['audio.task']._cron_process_queue()
+        except Exception:
+            _logger.exception("Queue worker error")
+        finally:
+            _task_queue.task_done()
+
+
+def _ensure_queue_worker():
+    """Start the queue consumer thread on first use."""
+    global _queue_worker_started
+    if _queue_worker_started:
+        return
+    with _queue_worker_lock:
+        if not _queue_worker_started:
+            thread = threading.Thread(
+                target=_queue_worker_loop,
+                name='audio_ai_queue_worker',
+                daemon=True,
+            )
+            thread.start()
+            _queue_worker_started = True
+
+
+# Worker pool for transcription jobs. Whisper inference is CPU-bound,
+# so separate processes are used instead of threads to bypass the GIL.
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _pool_worker_init():
+    """Initialize a transcription worker process.
+
+    Caps the BLAS thread pools to one thread each so parallel workers
+    do not oversubscribe the CPU.
+    """
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS',
+                'MKL_NUM_THREADS'):
+        os.environ.setdefault(var, '1')
+
+
+def _get_executor():
+    """Return the shared transcription worker pool, creating it lazily.
+
+    Returns:
+        concurrent.futures.ProcessPoolExecutor: Shared worker pool
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=MAX_CONCURRENT_BATCHES,
+                    initializer=_pool_worker_init,
+                )
+    return _executor
+
+
+def _transcribe_batch_job(payloads, config):
+    """Transcribe a batch of audio files in a worker process.
+
+    Runs without any database access; results are persisted by the
+    completion callback in the parent process.
+
+    Args:
+        payloads: List of (task_id, audio_base64, filename) tuples; the
+            base64 payload is decoded here so the request thread never
+            materializes the raw audio
+        config: Transcription settings from _get_transcription_config()
+
+    Returns:
+        list: (task_id, text, segments, error, elapsed) tuples
+    """
+    normalized = []
+    for task_id, audio_base64, filename in payloads:
+        audio_content = base64.b64decode(audio_base64)
+        audio_content, converted = normalize_audio(audio_content)
+        if converted:
+            filename = os.path.splitext(filename or 'audio')[0] + '.wav'
+        normalized.append((task_id, audio_content, filename))
+
+    whisper = WhisperService(
+        api_key=config['api_key'],
+        backend=config['backend'],
+        model_size=config['model_size'],
+        compute_type=config['compute_type'],
+        vad_filter=config['vad_filter'],
+        vad_min_silence_ms=config['vad_min_silence_ms'],
+    )
+    return whisper.transcribe_batch(
+        normalized,
+        language=config['language'],
+        batch_size=config['batch_size'],
+    )
 
 
 class AudioTask(models.Model):
@@ -51,6 +176,12 @@ class AudioTask(models.Model):
 
     audio_filename = fields.Char()
 
+    audio_sha256 = fields.Char(
+        readonly=True,
+        index=True,
+        help='Content hash used to reuse results for identical files',
+    )
+
     transcription = fields.Text(
         readonly=True,
     )
@@ -68,10 +199,27 @@ class AudioTask(models.Model):
         readonly=True,
     )
 
+    transcript_json = fields.Json(
+        readonly=True,
+        help='Structured transcript (segment timestamps) kept so later '
+             'consumers never re-submit the audio for them',
+    )
+
     error_message = fields.Text(
         readonly=True,
     )
 
+    streaming = fields.Boolean(
+        readonly=True,
+        help='Save confirmed text incrementally while transcribing',
+    )
+
+    segment_ids = fields.One2many(
+        comodel_name='audio.task.segment',
+        inverse_name='task_id',
+        readonly=True,
+    )
+
     queue_position = fields.Integer(
         compute='_compute_queue_position',
     )
@@ -101,6 +249,7 @@ class AudioTask(models.Model):
 
     partner_id = fields.Many2one(
         comodel_name='res.partner',
+        index=True,
     )
 
     priority = fields.Selection(
@@ -113,26 +262,50 @@ class AudioTask(models.Model):
 
     color = fields.Integer()
 
+    def init(self):
+        """Create a partial index backing the queue position ranking."""
+        sql.create_index(
+            self.env.cr,
+            'audio_task_pending_create_date_idx',
+            self._table,
+            ['create_date'],
+            where="state = 'pending'",
+        )
+
     @api.depends('state', 'create_date')
     def _compute_queue_position(self):
-        """Compute position in the processing queue."""
-        pending_tasks = self.search(
-            [('state', '=', 'pending')],
-            order='create_date asc'
-        )
-        position_map = {
-            task.id: idx + 1 for idx, task in enumerate(pending_tasks)
-        }
-        for record in self:
-            record.queue_position = position_map.get(record.id, 0)
+        """Compute position in the processing queue.
+
+        The ranking is pushed into Postgres with a single window query
+        instead of loading every pending task into memory.
+        """
+        pending = self.filtered(lambda task: task.state == 'pending')
+        (self - pending).queue_position = 0
+        if not pending:
+            return
+
+        self.flush_model(['state', 'create_date'])
+        self.env.cr.execute("""
+            SELECT id, position
+              FROM (
+                SELECT id,
+                       ROW_NUMBER() OVER (ORDER BY create_date) AS position
+                  FROM audio_task
+                 WHERE state = 'pending'
+              ) ranked
+             WHERE id = ANY(%s)
+        """, [pending.ids])
+        positions = dict(self.env.cr.fetchall())
+        for record in pending:
+            record.queue_position = positions.get(record.id, 0)
 
     def action_add_to_queue(self):
-        """Add task to processing queue."""
-        self.ensure_one()
-        self._validate_audio_file()
+        """Add tasks to the processing queue (batch-safe)."""
+        for task in self:
+            task._validate_audio_file()
 
-        api_key = self._get_config('openai_api_key')
-        if not api_key:
+        backend = self._get_config('transcription_backend', 'openai')
+        if backend == 'openai' and not self._get_config('openai_api_key'):
             raise UserError(_('Please configure OpenAI API key in Settings.'))
 
         self.write({
@@ -140,7 +313,8 @@ class AudioTask(models.Model):
             'error_message': False,
         })
 
-        self.message_post(body=_('Added to processing queue.'))
+        for task in self:
+            task.message_post(body=_('Added to processing queue.'))
 
         mode = self._get_config('processing_mode', 'immediate')
         if mode == 'immediate':
@@ -148,6 +322,27 @@ class AudioTask(models.Model):
 
         return True
 
+    def write(self, vals):
+        """Invalidate the content hash when the audio file changes.
+
+        A stale hash would let _apply_cached_result copy another
+        task's transcription of the old content onto the new file and
+        advertise the wrong fingerprint to future dedup lookups.
+        """
+        if 'audio_file' in vals and 'audio_sha256' not in vals:
+            vals = dict(vals, audio_sha256=False)
+        return super().write(vals)
+
+    def action_add_to_queue_streaming(self):
+        """Add task to processing queue in streaming mode.
+
+        Confirmed text appears on the task while the file is still
+        being transcribed, instead of only at the end.
+        """
+        self.ensure_one()
+        self.write({'streaming': True})
+        return self.action_add_to_queue()
+
     def action_reset(self):
         """Reset task to draft state and clear all results."""
         self.ensure_one()
@@ -158,6 +353,9 @@ class AudioTask(models.Model):
             'result_file': False,
             'result_filename': False,
             'error_message': False,
+            'transcript_json': False,
+            'streaming': False,
+            'segment_ids': [(5, 0, 0)],
         })
         return True
 
@@ -171,68 +369,167 @@ class AudioTask(models.Model):
 
     @api.model
     def _cron_process_queue(self):
-        """Cron job to process next task in queue."""
+        """Cron job to process pending tasks in batches."""
         if not self._is_processing_allowed():
             _logger.info("Processing not allowed at this time, skipping.")
             return
 
-        if self._has_active_transcription():
-            _logger.info("Transcription already in progress, skipping.")
-            return
-
-        next_task = self.search(
-            [('state', '=', 'pending')],
-            order='create_date asc',
-            limit=1
+        batch_size = int(
+            self._get_config('batch_size', str(DEFAULT_BATCH_SIZE)))
+
+        # Блокування рядків, щоб два споживачі не взяли одні й ті самі
+        # завдання. The cron runner and the queue worker (or two Odoo
+        # workers) may scan the queue concurrently; the 'transcribing'
+        # write only becomes visible to them after commit, which
+        # happens after dispatch. SKIP LOCKED makes each consumer take
+        # a disjoint batch and skip rows another one already holds.
+        self.flush_model(['state'])
+        self.env.cr.execute(
+            """
+            SELECT id
+            FROM audio_task
+            WHERE state = 'pending'
+            ORDER BY create_date ASC
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+            """,
+            [batch_size],
         )
+        next_tasks = self.browse([row[0] for row in self.env.cr.fetchall()])
 
-        if next_task:
-            _logger.info("Processing task %d from queue", next_task.id)
-            next_task._process_transcription()
+        if next_tasks:
+            _logger.info(
+                "Processing %d task(s) from queue", len(next_tasks))
+            next_tasks._process_transcription_batch()
 
     def _process_transcription(self):
-        """Start transcription process in background thread."""
+        """Start transcription of a single task in the background."""
         self.ensure_one()
+        self._process_transcription_batch()
 
-        api_key = self._get_config('openai_api_key')
-        if not api_key:
+    def _process_transcription_batch(self):
+        """Start transcription of the tasks in self as one batch.
+
+        The batch is handed to a background thread; a bounded semaphore
+        keeps at most MAX_CONCURRENT_BATCHES batches in flight. Tasks
+        stay pending when no slot is free and are picked up by the next
+        cron tick.
+        """
+        config = self._get_transcription_config()
+        if config['backend'] == 'openai' and not config['api_key']:
             self._set_error('OpenAI API key not configured.')
             return
 
-        audio_content = base64.b64decode(self.audio_file)
-        language = self._get_config('whisper_language', 'uk')
+        tasks = self.browse(
+            [task.id for task in self if not task._apply_cached_result()])
+        if not tasks:
+            return
+
+        streaming_tasks = tasks.filtered('streaming')
+        for task in streaming_tasks:
+            task._start_streaming(config)
+        tasks -= streaming_tasks
+        if not tasks:
+            return
+
+        if not _batch_slots.acquire(blocking=False):
+            _logger.info("Maximum concurrent batches reached, skipping.")
+            return
+
+        payloads = [
+            (task.id, task.audio_file, task.audio_filename)
+            for task in tasks
+        ]
+
+        tasks.write({'state': 'transcribing'})
+        for task in tasks:
+            task.message_post(body=_('Transcription started...'))
 
-        self.write({'state': 'transcribing'})
-        self.message_post(body=_('Transcription started...'))
+        future = _get_executor().submit(
+            _transcribe_batch_job, payloads, config,
+        )
+        future.add_done_callback(functools.partial(
+            self._on_batch_done,
+            payloads=payloads,
+            dbname=self.env.cr.dbname,
+            uid=self.env.uid,
+            context=dict(self.env.context),
+        ))
+
+    def _start_streaming(self, config):
+        """Start streaming transcription of this task in a thread.
+
+        Streaming runs in a thread rather than the worker pool because
+        each confirmed fragment is written back to the database as it
+        arrives.
 
-        thread_args = (
-            self.id, audio_content, self.audio_filename, api_key, language
+        Args:
+            config: Transcription settings from _get_transcription_config()
+        """
+        self.ensure_one()
+        self.write({'state': 'transcribing', 'transcription': False})
+        self.message_post(body=_('Streaming transcription started...'))
+
+        thread = threading.Thread(
+            target=self._transcribe_streaming_thread,
+            args=(self.id, self.audio_file, self.audio_filename, config,
+                  self.env.cr.dbname, self.env.uid, dict(self.env.context)),
+            name=f'audio_ai_streaming_{self.id}',
+            daemon=True,
         )
-        self._start_thread(target=self._transcribe_thread, args=thread_args)
+        thread.start()
+
+    def _transcribe_streaming_thread(
+            self, task_id, audio_base64, filename, config, dbname, uid,
+            context):
+        """Transcribe one task incrementally, saving partial results.
 
-    def _transcribe_thread(
-            self, task_id, audio_content, filename, api_key, language):
-        """Execute transcription in separate thread.
+        Each confirmed text fragment is appended to the task's
+        transcription and committed, so reloading the form shows the
+        progress so far instead of nothing until the end.
 
         Args:
             task_id: ID of the task being processed
-            audio_content: Binary audio data
+            audio_base64: Base64-encoded audio data
             filename: Original filename
-            api_key: OpenAI API key
-            language: Language code for transcription
+            config: Transcription settings from _get_transcription_config()
+            dbname: Database name
+            uid: User ID
+            context: Odoo context
         """
-        dbname = self.env.cr.dbname
-        uid = self.env.uid
-        context = dict(self.env.context)
-
         start_time = time.time()
 
+        def on_partial(fragment):
+            with new_environment(dbname, uid, context) as env:
+                task = env['audio.task'].sudo().browse(task_id)
+                if not task.exists():
+                    return
+                text = task.transcription
+                task.write({
+                    'transcription': f'{text} {fragment}'
+                    if text else fragment,
+                })
+                env.cr.commit()
+
         try:
-            whisper = WhisperService(api_key=api_key)
-            transcription = whisper.transcribe(
-                audio_binary=audio_content,
-                filename=filename,
-                language=language,
+            audio_content = base64.b64decode(audio_base64)
+            audio_content, converted = normalize_audio(audio_content)
+            if converted:
+                filename = os.path.splitext(filename or 'audio')[0] + '.wav'
+
+            whisper = WhisperService(
+                api_key=config['api_key'],
+                backend=config['backend'],
+                model_size=config['model_size'],
+                compute_type=config['compute_type'],
+                vad_filter=config['vad_filter'],
+                vad_min_silence_ms=config['vad_min_silence_ms'],
+            )
+            transcription = whisper.transcribe_streaming(
+                audio_content, filename,
+                language=config['language'],
+                batch_size=config['batch_size'],
+                on_partial=on_partial,
             )
 
             if not transcription or not transcription.strip():
@@ -240,28 +537,115 @@ class AudioTask(models.Model):
 
             elapsed = time.time() - start_time
             self._save_transcription(
-                task_id, transcription, elapsed, dbname, uid, context)
+                task_id, transcription, [], elapsed, dbname, uid, context)
 
         except Exception as e:
-            _logger.exception("Transcription error: %s", e)
+            _logger.exception("Streaming transcription error: %s", e)
             self._save_error(task_id, str(e), dbname, uid, context)
 
+    def _apply_cached_result(self):
+        """Reuse the result of an identical, already transcribed file.
+
+        Looks up a done task with the same content hash and copies its
+        transcription instead of re-running the model.
+
+        Returns:
+            bool: True if a cached result was applied
+        """
+        self.ensure_one()
+        if not self.audio_sha256:
+            return False
+
+        cached = self.sudo().search(
+            [
+                ('audio_sha256', '=', self.audio_sha256),
+                ('state', '=', 'done'),
+                ('id', '!=', self.id),
+            ],
+            limit=1
+        )
+        if not cached:
+            return False
+
+        self.write({
+            'state': 'done',
+            'transcription': cached.transcription,
+            'transcription_time': cached.transcription_time,
+            'result_file': cached.result_file,
+            'result_filename': f'transcription_{self.id}.txt',
+            'transcript_json': cached.transcript_json,
+            'segment_ids': [(5, 0, 0)] + [
+                (0, 0, {'start_time': segment.start_time,
+                        'text': segment.text})
+                for segment in cached.segment_ids
+            ],
+        })
+        self.message_post(
+            body=_('Reused cached transcription of an identical file.'))
+        _logger.info(
+            "Task %d reused cached transcription from task %d",
+            self.id, cached.id)
+        return True
+
+    def _on_batch_done(self, future, payloads, dbname, uid, context):
+        """Persist the results of a finished transcription batch.
+
+        Runs in the executor's callback thread, in the parent process.
+
+        Args:
+            future: Completed future holding the batch results
+            payloads: List of (task_id, audio_base64, filename) tuples
+            dbname: Database name
+            uid: User ID
+            context: Odoo context
+        """
+        try:
+            try:
+                results = future.result()
+            except Exception as e:
+                _logger.exception("Batch transcription error: %s", e)
+                for task_id, _audio, _filename in payloads:
+                    self._save_error(task_id, str(e), dbname, uid, context)
+                return
+
+            for task_id, text, segments, error, elapsed in results:
+                if error or not (text and text.strip()):
+                    message = error or "Empty transcription received"
+                    self._save_error(task_id, message, dbname, uid, context)
+                else:
+                    self._save_transcription(
+                        task_id, text, segments, elapsed, dbname, uid,
+                        context)
+        finally:
+            _batch_slots.release()
+
     def _save_transcription(
-            self, task_id, transcription, elapsed, dbname, uid, context):
+            self, task_id, transcription, segments, elapsed, dbname, uid,
+            context):
         """Save transcription result with retry logic.
 
         Args:
             task_id: ID of the task
             transcription: Transcription text
+            segments: List of (start_seconds, text) chunk tuples
             elapsed: Processing time in seconds
             dbname: Database name
             uid: User ID
             context: Odoo context
         """
+        # Skip chatter tracking and follower notifications while saving;
+        # the result note is logged without notifying subscribers.
+        save_context = dict(
+            context,
+            tracking_disable=True,
+            mail_notrack=True,
+            mail_create_nolog=True,
+        )
+
         # Повторні спроби при помилках серіалізації БД
         for attempt in range(MAX_RETRIES):
             try:
-                with new_environment(dbname, uid, context) as env:
+                with new_environment(dbname, uid, save_context) as env:
                     task = env['audio.task'].sudo().browse(task_id)
                     if not task.exists():
                         return
@@ -276,19 +660,26 @@ class AudioTask(models.Model):
                         'transcription_time': elapsed,
                         'result_file': file_binary,
                         'result_filename': filename,
+                        'transcript_json': {
+                            'segments': [
+                                {'start': start, 'text': text}
+                                for start, text in segments
+                            ],
+                        } if segments else False,
                     })
 
-                    env['ir.attachment'].create({
-                        'name': filename,
-                        'datas': file_binary,
-                        'res_model': 'audio.task',
-                        'res_id': task_id,
-                        'type': 'binary',
-                    })
+                    if segments:
+                        env['audio.task.segment'].create([
+                            {
+                                'task_id': task_id,
+                                'start_time': start,
+                                'text': text,
+                            }
+                            for start, text in segments
+                        ])
 
-                    preview = transcription[:500]
-                    if len(transcription) > 500:
-                        preview += '...'
+                    preview = transcription[:500] + (
+                        '...' if len(transcription) > 500 else '')
 
                     msg = _(
                         'Transcription completed in %(time).2f sec.\n\n'
@@ -296,7 +687,7 @@ class AudioTask(models.Model):
                         time=elapsed,
                         text=preview,
                     )
-                    task.message_post(body=msg)
+                    task._message_log(body=msg)
 
                     env.cr.commit()
                     _logger.info("Transcription saved for task %d", task_id)
@@ -304,14 +695,11 @@ class AudioTask(models.Model):
                     task._trigger_queue_processing()
                     return
 
-            except Exception as e:
-                # Затримка перед повторною спробою при помилці серіалізації
-                err_str = str(e)
-                can_retry = attempt < MAX_RETRIES - 1
-                if 'could not serialize' in err_str and can_retry:
-                    time.sleep(RETRY_DELAY * (attempt + 1))
-                    continue
-                raise
+            except pg_errors.SerializationFailure:
+                if attempt >= MAX_RETRIES - 1:
+                    raise
+                # Затримка з випадковим розкидом перед повторною спробою
+                time.sleep(random.uniform(0, RETRY_DELAY * 2 ** attempt))
 
     def _save_error(self, task_id, error_message, dbname, uid, context):
         """Save error state for failed transcription.
@@ -334,7 +722,8 @@ class AudioTask(models.Model):
                     'error_message': error_message,
                 })
 
-                task.message_post(body=_('Error: %(msg)s', msg=error_message))
+                task._message_log(
+                    body=_('Error: %(msg)s', msg=error_message))
                 env.cr.commit()
 
                 task._trigger_queue_processing()
@@ -355,61 +744,115 @@ class AudioTask(models.Model):
         self.message_post(body=_('Error: %(msg)s', msg=message))
 
     def _trigger_queue_processing(self):
-        """Trigger cron job to process next task in queue."""
+        """Wake the in-process queue worker (immediate mode).
+
+        The wake-up is registered post-commit so the worker only runs
+        once the pending state is visible to its own cursor.
+        """
         mode = self._get_config('processing_mode', 'immediate')
         if mode == 'immediate':
-            self.env.ref(
-                'audio_ai_processor.ir_cron_process_audio_queue'
-            )._trigger()
+            _ensure_queue_worker()
+            dbname = self.env.cr.dbname
+            self.env.cr.postcommit.add(
+                lambda: _task_queue.put(dbname))
 
-    def _is_processing_allowed(self):
-        """Check if processing is allowed based on schedule settings.
+    @api.model
+    @ormcache()
+    def _get_allowed_hour_mask(self):
+        """Return a 24-bit mask of hours when scheduled runs may start.
+
+        Bit h is set when processing is allowed during hour h. Computed
+        once from the settings and cached; saving the settings clears
+        the cache. The schedule check is then a single AND against the
+        current hour's bit.
 
         Returns:
-            bool: True if processing is allowed
+            int: Bitmask of permitted hours (bit 0 = midnight)
         """
-        mode = self._get_config('processing_mode', 'immediate')
-
-        if mode == 'immediate':
-            return True
-
-        # Перевірка чи поточний час входить у дозволений діапазон
         hour_from = int(self._get_config('scheduled_hour_from', '22'))
         hour_to = int(self._get_config('scheduled_hour_to', '6'))
-        current_hour = datetime.now().hour
 
         # Обробка нічного діапазону (наприклад, 22:00 - 06:00)
         if hour_from <= hour_to:
-            return hour_from <= current_hour < hour_to
-        return current_hour >= hour_from or current_hour < hour_to
+            hours = range(hour_from, hour_to)
+        else:
+            hours = itertools.chain(range(hour_from, 24), range(hour_to))
+        return sum(1 << hour for hour in hours)
 
-    def _has_active_transcription(self):
-        """Check if any transcription is currently in progress.
+    def _is_processing_allowed(self):
+        """Check if processing is allowed based on schedule settings.
 
         Returns:
-            bool: True if transcription is active
+            bool: True if processing is allowed
         """
-        return self.search_count([('state', '=', 'transcribing')]) > 0
+        mode = self._get_config('processing_mode', 'immediate')
+
+        if mode == 'immediate':
+            return True
+
+        return bool(
+            self._get_allowed_hour_mask() & (1 << time.localtime().tm_hour))
 
     def _validate_audio_file(self):
-        """Validate uploaded audio file format."""
+        """Validate uploaded audio file by sniffing its magic bytes.
+
+        Checking the file header instead of the filename extension
+        catches mislabeled files before any transcription cost is paid
+        and cannot be fooled by renaming.
+        """
         if not self.audio_file:
             raise UserError(_('Please upload an audio file first.'))
 
         if not self.audio_filename:
             raise UserError(_('Audio filename is missing.'))
 
-        valid_extensions = ('.mp3', '.wav', '.m4a', '.ogg', '.flac')
-        if not self.audio_filename.lower().endswith(valid_extensions):
-            supported = ', '.join(valid_extensions)
+        # 24 base64 characters decode to the first 18 bytes of the file.
+        header = base64.b64decode(self.audio_file[:24])
+        if not sniff_audio_format(header):
             raise UserError(_(
                 'Invalid audio format. Supported: %(formats)s',
-                formats=supported,
+                formats='MP3, WAV, M4A, OGG, FLAC',
             ))
 
+        if not self.audio_sha256:
+            # Hash the base64 payload as-is: it identifies the content
+            # just as well, and the request thread never decodes the
+            # whole file just to fingerprint it.
+            payload = self.audio_file
+            if isinstance(payload, str):
+                payload = payload.encode('ascii')
+            content_hash = hashlib.sha256(payload).hexdigest()
+            self.write({'audio_sha256': content_hash})
+
+    def _get_transcription_config(self):
+        """Collect all transcription settings in one dict.
+
+        The dict is picklable so it can be shipped to worker processes.
+
+        Returns:
+            dict: Settings for WhisperService and the worker job
+        """
+        return {
+            'backend': self._get_config('transcription_backend', 'openai'),
+            'api_key': self._get_config('openai_api_key'),
+            'language': self._get_config('whisper_language', 'uk'),
+            'model_size': self._get_config('whisper_model_size', 'base'),
+            'compute_type': self._get_config('whisper_compute_type', 'auto'),
+            'batch_size': int(
+                self._get_config('batch_size', str(DEFAULT_BATCH_SIZE))),
+            'vad_filter': str2bool(
+                str(self._get_config('vad_filter', 'True')), default=True),
+            'vad_min_silence_ms': int(
+                self._get_config('vad_min_silence_ms', '500')),
+        }
+
+    @api.model
     def _get_config(self, param_name, default=None):
         """Get configuration parameter value.
 
+        Reads from the cached settings snapshot; saving the module
+        settings refreshes it (see ResConfigSettings).
+
         Args:
             param_name: Parameter name without prefix
             default: Default value if not set
@@ -417,21 +860,29 @@ class AudioTask(models.Model):
         Returns:
             Parameter value or default
         """
-        return self.env['ir.config_parameter'].sudo().get_param(
-            f'audio_ai_processor.{param_name}',
-            default
-        )
+        settings = self.env['res.config.settings'].get_audio_settings()
+        value = settings.get(param_name)
+        return value if value not in (None, '') else default
 
-    def _start_thread(self, target, args):
-        """Start daemon thread for background processing.
 
-        Args:
-            target: Thread target function
-            args: Arguments for target function
-        """
-        thread = threading.Thread(
-            target=target,
-            args=args,
-            daemon=True,
-        )
-        thread.start()
+class AudioTaskSegment(models.Model):
+    """Transcribed chunk of an audio task, with its start offset."""
+
+    _name = 'audio.task.segment'
+    _description = 'Audio Task Transcription Segment'
+    _order = 'start_time'
+
+    task_id = fields.Many2one(
+        comodel_name='audio.task',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+
+    start_time = fields.Float(
+        help='Segment start position in seconds',
+    )
+
+    text = fields.Text(
+        readonly=True,
+    )
@@ -1,6 +1,7 @@
 """Configuration settings for Audio AI Processor module."""
 
-from odoo import fields, models
+from odoo import api, fields, models
+from odoo.tools import ormcache
 
 
 class ResConfigSettings(models.TransientModel):
@@ -8,6 +9,59 @@ class ResConfigSettings(models.TransientModel):
 
     _inherit = 'res.config.settings'
 
+    transcription_backend = fields.Selection(
+        selection=[
+            ('openai', 'OpenAI Whisper API'),
+            ('faster_whisper_local', 'Local faster-whisper (CTranslate2)'),
+        ],
+        default='openai',
+        help='OpenAI: send audio to the Whisper API (requires API key). '
+             'Local: run faster-whisper on this server, no network calls.',
+        config_parameter='audio_ai_processor.transcription_backend',
+    )
+
+    whisper_model_size = fields.Selection(
+        selection=[
+            ('tiny', 'Tiny'),
+            ('base', 'Base'),
+            ('small', 'Small'),
+            ('medium', 'Medium'),
+            ('large-v3', 'Large v3'),
+        ],
+        default='base',
+        help='Model size for the local faster-whisper backend. '
+             'Larger models are more accurate but slower.',
+        config_parameter='audio_ai_processor.whisper_model_size',
+    )
+
+    whisper_compute_type = fields.Selection(
+        selection=[
+            ('auto', 'Auto-detect'),
+            ('int8', 'int8'),
+            ('int8_float16', 'int8 + float16'),
+            ('float16', 'float16'),
+        ],
+        default='auto',
+        help='Quantization for the local model. Auto picks int8 on CPU '
+             'and int8_float16 (or float16) on CUDA devices.',
+        config_parameter='audio_ai_processor.whisper_compute_type',
+    )
+
+    # No config_parameter here: set_param drops a parameter when handed
+    # a falsy value, so a Boolean routed through it can never persist
+    # False — get/set_values store an explicit '1'/'0' instead.
+    vad_filter = fields.Boolean(
+        default=True,
+        help='Skip silent regions with voice activity detection before '
+             'decoding (local backend)',
+    )
+
+    vad_min_silence_ms = fields.Integer(
+        default=500,
+        help='Minimum silence duration in milliseconds for the VAD filter',
+        config_parameter='audio_ai_processor.vad_min_silence_ms',
+    )
+
     openai_api_key = fields.Char(
         help='API key for Whisper transcription',
         config_parameter='audio_ai_processor.openai_api_key',
@@ -38,6 +92,12 @@ class ResConfigSettings(models.TransientModel):
         config_parameter='audio_ai_processor.processing_mode',
     )
 
+    batch_size = fields.Integer(
+        default=8,
+        help='Maximum number of queued tasks processed per batch',
+        config_parameter='audio_ai_processor.batch_size',
+    )
+
     scheduled_hour_from = fields.Integer(
         default=22,
         help='Start processing from this hour (0-23)',
@@ -49,3 +109,40 @@ class ResConfigSettings(models.TransientModel):
         help='Process until this hour (0-23)',
         config_parameter='audio_ai_processor.scheduled_hour_to',
     )
+
+    @api.model
+    @ormcache()
+    def get_audio_settings(self):
+        """Return all module parameters as one cached snapshot.
+
+        One search_read fetches every audio_ai_processor.* parameter at
+        once; queue workers reading several settings per task then hit
+        the cache instead of issuing a SELECT per parameter.
+
+        Returns:
+            dict: Parameter values keyed by name without the module
+                prefix
+        """
+        data = self.env['ir.config_parameter'].sudo().search_read(
+            [('key', 'like', 'audio_ai_processor.%')],
+            ['key', 'value'],
+        )
+        prefix_length = len('audio_ai_processor.')
+        return {
+            item['key'][prefix_length:]: item['value'] for item in data
+        }
+
+    def get_values(self):
+        """Read settings, decoding the explicit VAD filter flag."""
+        res = super().get_values()
+        value = self.env['ir.config_parameter'].sudo().get_param(
+            'audio_ai_processor.vad_filter', '1')
+        res['vad_filter'] = value != '0'
+        return res
+
+    def set_values(self):
+        """Persist settings and drop the cached parameter values."""
+        super().set_values()
+        self.env['ir.config_parameter'].sudo().set_param(
+            'audio_ai_processor.vad_filter', '1' if self.vad_filter else '0')
+        self.env.registry.clear_cache()
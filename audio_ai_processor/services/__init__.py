@@ -1,4 +1,5 @@
 """Services for Audio AI Processor module."""
 
+from . import audio_utils
 from . import env_utils
 from . import whisper_service
@@ -0,0 +1,216 @@
+"""Audio preprocessing helpers built on ffmpeg."""
+
+import logging
+import re
+import subprocess
+
+_logger = logging.getLogger(__name__)
+
+# Whisper resamples everything to 16 kHz mono internally; feeding it
+# that format directly skips the redundant conversion per file.
+TARGET_SAMPLE_RATE = 16000
+
+# Silence detection and chunking parameters for long-file splitting.
+SILENCE_NOISE = '-30dB'
+SILENCE_MIN_DURATION = 0.5
+MIN_CHUNK_SECONDS = 30.0
+MAX_CHUNK_SECONDS = 60.0
+
+_DURATION_RE = re.compile(r'Duration: (\d+):(\d+):(\d+\.?\d*)')
+_SILENCE_END_RE = re.compile(r'silence_end: (\d+\.?\d*)')
+_SILENCE_START_RE = re.compile(r'silence_start: (\d+\.?\d*)')
+
+
+def sniff_audio_format(header):
+    """Identify the audio container from the file's first bytes.
+
+    Args:
+        header: At least the first 12 bytes of the file
+
+    Returns:
+        str: Format name ('mp3', 'wav', 'ogg', 'flac', 'm4a') or None
+            when the header matches no supported format
+    """
+    # Bare MPEG frames start with an 11-bit sync word (0xFF followed by
+    # three set bits); matching it by mask also covers CRC-protected
+    # frames and the less common layer/version combinations.
+    if header.startswith(b'ID3') or (
+            len(header) >= 2
+            and header[0] == 0xFF
+            and header[1] & 0xE0 == 0xE0):
+        return 'mp3'
+    if header.startswith(b'RIFF') and header[8:12] == b'WAVE':
+        return 'wav'
+    if header.startswith(b'OggS'):
+        return 'ogg'
+    if header.startswith(b'fLaC'):
+        return 'flac'
+    if header[4:8] == b'ftyp':
+        return 'm4a'
+    return None
+
+
+def normalize_audio(audio_binary):
+    """Convert audio to 16 kHz mono PCM WAV using ffmpeg.
+
+    Args:
+        audio_binary: Binary audio data in any ffmpeg-readable format
+
+    Returns:
+        tuple: (audio_bytes, normalized) where normalized is False and
+            the original bytes are returned when conversion is not
+            possible (ffmpeg missing or decode failure)
+    """
+    command = [
+        'ffmpeg', '-v', 'error',
+        '-i', 'pipe:0',
+        '-ar', str(TARGET_SAMPLE_RATE),
+        '-ac', '1',
+        '-f', 'wav',
+        'pipe:1',
+    ]
+    try:
+        process = subprocess.run(
+            command, input=audio_binary, capture_output=True, check=True)
+    except FileNotFoundError:
+        _logger.warning('ffmpeg not found, skipping audio normalization')
+        return audio_binary, False
+    except subprocess.CalledProcessError as e:
+        _logger.warning(
+            'Audio normalization failed: %s',
+            e.stderr.decode('utf-8', errors='replace'))
+        return audio_binary, False
+
+    return process.stdout, True
+
+
+def _detect_silences(audio_binary):
+    """Find silent regions and total duration using ffmpeg silencedetect.
+
+    Args:
+        audio_binary: Binary audio data
+
+    Returns:
+        tuple: (duration, silences) where duration is the total length
+            in seconds (or None when unknown) and silences is a list of
+            (start, end) tuples in seconds
+    """
+    command = [
+        'ffmpeg', '-i', 'pipe:0',
+        '-af', f'silencedetect=noise={SILENCE_NOISE}:d={SILENCE_MIN_DURATION}',
+        '-f', 'null', '-',
+    ]
+    try:
+        process = subprocess.run(
+            command, input=audio_binary, capture_output=True)
+    except FileNotFoundError:
+        _logger.warning('ffmpeg not found, skipping silence detection')
+        return None, []
+
+    stderr = process.stderr.decode('utf-8', errors='replace')
+
+    duration = None
+    match = _DURATION_RE.search(stderr)
+    if match:
+        hours, minutes, seconds = match.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    starts = [float(m) for m in _SILENCE_START_RE.findall(stderr)]
+    ends = [float(m) for m in _SILENCE_END_RE.findall(stderr)]
+    silences = list(zip(starts, ends))
+
+    return duration, silences
+
+
+def probe_duration(audio_binary):
+    """Return the audio duration in seconds.
+
+    Args:
+        audio_binary: Binary audio data
+
+    Returns:
+        float: Duration in seconds, or None when it cannot be read
+    """
+    command = ['ffmpeg', '-i', 'pipe:0', '-f', 'null', '-']
+    try:
+        process = subprocess.run(
+            command, input=audio_binary, capture_output=True)
+    except FileNotFoundError:
+        return None
+
+    match = _DURATION_RE.search(
+        process.stderr.decode('utf-8', errors='replace'))
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def extract_chunk(audio_binary, start, duration):
+    """Cut one chunk out of the audio as 16 kHz mono WAV.
+
+    Args:
+        audio_binary: Binary audio data
+        start: Chunk start in seconds
+        duration: Chunk length in seconds
+
+    Returns:
+        bytes: Chunk audio as WAV
+    """
+    command = [
+        'ffmpeg', '-v', 'error',
+        '-i', 'pipe:0',
+        '-ss', f'{start:.3f}',
+        '-t', f'{duration:.3f}',
+        '-ar', str(TARGET_SAMPLE_RATE),
+        '-ac', '1',
+        '-f', 'wav',
+        'pipe:1',
+    ]
+    process = subprocess.run(
+        command, input=audio_binary, capture_output=True, check=True)
+    return process.stdout
+
+
+def split_on_silence(audio_binary):
+    """Split long audio into chunks, cutting at silent regions.
+
+    Cut points are placed in detected silences so words are not cut in
+    half; when no silence falls inside the allowed window the chunk is
+    cut at MAX_CHUNK_SECONDS. Short files are returned as one chunk.
+
+    Args:
+        audio_binary: Binary audio data
+
+    Returns:
+        list: (start_seconds, chunk_bytes) tuples in playback order
+    """
+    duration, silences = _detect_silences(audio_binary)
+    if not duration or duration <= MAX_CHUNK_SECONDS:
+        return [(0.0, audio_binary)]
+
+    # Candidate cut points: the middle of each detected silence.
+    candidates = [(start + end) / 2 for start, end in silences]
+
+    cuts = []
+    chunk_start = 0.0
+    while duration - chunk_start > MAX_CHUNK_SECONDS:
+        window_cuts = [
+            point for point in candidates
+            if chunk_start + MIN_CHUNK_SECONDS
+            <= point <= chunk_start + MAX_CHUNK_SECONDS
+        ]
+        cut = window_cuts[-1] if window_cuts \
+            else chunk_start + MAX_CHUNK_SECONDS
+        cuts.append((chunk_start, cut - chunk_start))
+        chunk_start = cut
+    cuts.append((chunk_start, duration - chunk_start))
+
+    try:
+        return [
+            (start, extract_chunk(audio_binary, start, length))
+            for start, length in cuts
+        ]
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        _logger.warning('Audio chunking failed, using whole file: %s', e)
+        return [(0.0, audio_binary)]
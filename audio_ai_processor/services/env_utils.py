@@ -22,5 +22,9 @@ def new_environment(dbname, uid=None, context=None):
 
     with registry(dbname).cursor() as cursor:
         env = api.Environment(cursor, uid or SUPERUSER_ID, context)
-        yield env
+        try:
+            yield env
+        except Exception:
+            cursor.rollback()
+            raise
         cursor.commit()
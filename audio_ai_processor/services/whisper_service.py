@@ -1,71 +1,572 @@
-"""Service for audio transcription using OpenAI Whisper API."""
+"""Service for audio transcription using OpenAI Whisper API or a local model."""
 
+import concurrent.futures
+import io
+import itertools
 import logging
+import os
+import threading
+import time
+import types
 
+import httpx
 from openai import OpenAI
 
+from .audio_utils import extract_chunk, probe_duration, split_on_silence
+
 _logger = logging.getLogger(__name__)
 
+# Hard upload limit of the Whisper API. Files above it are normally
+# split before upload; if splitting was impossible (no ffmpeg) the
+# request would only fail server-side after uploading the whole file,
+# so it is rejected locally instead.
+API_MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+
+# Loaded faster-whisper replicas, keyed by (model_size, device,
+# compute_type). On multi-GPU hosts one replica is loaded per device
+# and calls are spread round-robin, so N GPUs serve N transcriptions
+# concurrently. Loading takes seconds and hundreds of MB, so replicas
+# survive across transcriptions instead of being rebuilt per task.
+_REPLICAS = {}
+_REPLICA_COUNTERS = {}
+_MODEL_LOCK = threading.Lock()
+
+# OpenAI clients keyed by API key. Rebuilding the client per task
+# rebuilt its httpx transport and paid a fresh TLS handshake on every
+# request; a cached client keeps connections alive across tasks.
+_CLIENT_CACHE = {}
+_CLIENT_LOCK = threading.Lock()
+
+
+def _get_openai_client(api_key):
+    """Return a cached OpenAI client with a pooled httpx transport.
+
+    Args:
+        api_key: OpenAI API key
+
+    Returns:
+        openai.OpenAI: Shared client for this key
+    """
+    client = _CLIENT_CACHE.get(api_key)
+    if client is None:
+        with _CLIENT_LOCK:
+            client = _CLIENT_CACHE.get(api_key)
+            if client is None:
+                client = OpenAI(
+                    api_key=api_key,
+                    http_client=httpx.Client(
+                        limits=httpx.Limits(
+                            max_keepalive_connections=20,
+                            max_connections=40,
+                        ),
+                        timeout=httpx.Timeout(60.0, connect=5.0),
+                    ),
+                )
+                _CLIENT_CACHE[api_key] = client
+    return client
+
+
+def _detect_local_device(compute_type='auto'):
+    """Pick device and compute type for local inference.
+
+    With 'auto', int8 quantization is used on CPU (faster and smaller
+    than fp32) and int8_float16 on CUDA when the device supports it
+    (half the VRAM of float16), falling back to float16 otherwise.
+
+    Args:
+        compute_type: Requested compute type, or 'auto' to detect
+
+    Returns:
+        tuple: (device, compute_type) for faster_whisper.WhisperModel
+    """
+    device = 'cpu'
+    supported = ()
+    try:
+        import ctranslate2
+        if ctranslate2.get_cuda_device_count() > 0:
+            device = 'cuda'
+            supported = ctranslate2.get_supported_compute_types('cuda')
+    except Exception:
+        pass
+
+    if compute_type and compute_type != 'auto':
+        return device, compute_type
+    if device == 'cuda':
+        if 'int8_float16' in supported:
+            return 'cuda', 'int8_float16'
+        return 'cuda', 'float16'
+    return 'cpu', 'int8'
+
+
+def _get_local_replica(model_size, compute_type='auto'):
+    """Return the next model replica, round-robin across CUDA devices.
+
+    One (model, pipeline) pair is loaded per CUDA device (a single pair
+    on CPU) and successive calls rotate through them, so concurrent
+    transcriptions land on different GPUs.
+
+    Args:
+        model_size: Model size name (e.g., 'base', 'small', 'large-v3')
+        compute_type: Quantization to use, or 'auto' to detect
+
+    Returns:
+        tuple: (WhisperModel, BatchedInferencePipeline) replica
+    """
+    from faster_whisper import BatchedInferencePipeline, WhisperModel
+
+    device, compute_type = _detect_local_device(compute_type)
+    key = (model_size, device, compute_type)
+    replicas = _REPLICAS.get(key)
+    if replicas is None:
+        with _MODEL_LOCK:
+            replicas = _REPLICAS.get(key)
+            if replicas is None:
+                device_count = 1
+                if device == 'cuda':
+                    import ctranslate2
+                    device_count = max(
+                        1, ctranslate2.get_cuda_device_count())
+                replicas = []
+                for device_index in range(device_count):
+                    _logger.info(
+                        'Loading faster-whisper model %s (device=%s:%d, '
+                        'compute_type=%s)', model_size, device,
+                        device_index, compute_type)
+                    model = WhisperModel(
+                        model_size,
+                        device=device,
+                        device_index=device_index,
+                        compute_type=compute_type,
+                    )
+                    replicas.append(
+                        (model, BatchedInferencePipeline(model=model)))
+                _REPLICAS[key] = replicas
+                _REPLICA_COUNTERS[key] = itertools.count()
+
+    index = next(_REPLICA_COUNTERS[key])
+    return replicas[index % len(replicas)]
+
 
 class WhisperService:
-    """Service class for interacting with OpenAI Whisper API."""
+    """Service class for audio transcription.
 
-    MIME_TYPES = {
+    Supports two backends: the OpenAI Whisper API and a local
+    faster-whisper (CTranslate2) model. The local backend avoids
+    per-file HTTPS round trips and runs quantized inference.
+    """
+
+    MIME_TYPES = types.MappingProxyType({
         'mp3': 'audio/mpeg',
         'wav': 'audio/wav',
         'webm': 'audio/webm',
         'm4a': 'audio/mp4',
         'ogg': 'audio/ogg',
         'flac': 'audio/flac',
-    }
+    })
 
-    def __init__(self, api_key):
-        """Initialize Whisper service with API key.
+    def __init__(self, api_key=None, backend='openai', model_size='base',
+                 vad_filter=True, vad_min_silence_ms=500,
+                 compute_type='auto'):
+        """Initialize Whisper service.
 
         Args:
-            api_key: OpenAI API key
+            api_key: OpenAI API key (required for the 'openai' backend)
+            backend: 'openai' or 'faster_whisper_local'
+            model_size: Local model size (ignored for the API backend)
+            vad_filter: Drop silent regions before decoding (local backend)
+            vad_min_silence_ms: Minimum silence length for the VAD filter
+            compute_type: Local model quantization, or 'auto' to detect
         """
-        self.client = OpenAI(api_key=api_key)
+        self.backend = backend
+        self.model_size = model_size
+        self.vad_filter = vad_filter
+        self.vad_min_silence_ms = vad_min_silence_ms
+        self.compute_type = compute_type
+        self.client = None
+        if backend == 'openai':
+            self.client = _get_openai_client(api_key)
+
+    @classmethod
+    def close_clients(cls):
+        """Close all cached OpenAI clients (server shutdown)."""
+        with _CLIENT_LOCK:
+            for client in _CLIENT_CACHE.values():
+                client.close()
+            _CLIENT_CACHE.clear()
+
+    def _vad_arguments(self):
+        """Build the VAD keyword arguments for faster-whisper calls.
+
+        Returns:
+            dict: Keyword arguments for model/pipeline transcribe()
+        """
+        if not self.vad_filter:
+            return {'vad_filter': False}
+        return {
+            'vad_filter': True,
+            'vad_parameters': {
+                'min_silence_duration_ms': self.vad_min_silence_ms,
+            },
+        }
 
     def transcribe(
-            self, audio_binary, filename, language=None, model='whisper-1'):
-        """Transcribe audio file using Whisper API.
+            self, audio_binary, filename, language=None, model='whisper-1',
+            response_format='text'):
+        """Transcribe audio file using the configured backend.
 
         Args:
             audio_binary: Binary audio data
             filename: Original filename for MIME type detection
             language: Language code hint (e.g., 'uk', 'en')
-            model: Whisper model name
+            model: Whisper API model name (API backend only)
+            response_format: 'text' for plain text or 'verbose_json'
+                for a dict with segments and timestamps (API backend;
+                the local backend always returns plain text here)
 
         Returns:
-            str: Transcribed text
+            str or dict: Transcribed text, or the verbose payload when
+                response_format is 'verbose_json'
         """
         if not audio_binary:
             raise ValueError('Audio file is empty')
 
-        mime_type = self._get_mime_type(filename)
-
         _logger.info(
-            'Starting transcription: file=%s, language=%s', filename, language)
+            'Starting transcription: file=%s, language=%s, backend=%s',
+            filename, language, self.backend)
+
+        if self.backend == 'faster_whisper_local':
+            transcript = self._transcribe_local(audio_binary, language)
+        else:
+            transcript = self._transcribe_openai(
+                audio_binary, filename, language, model,
+                response_format=response_format)
+
+        length = len(transcript) if isinstance(transcript, str) \
+            else len(transcript.get('text') or '')
+        _logger.info('Transcription completed: %d characters', length)
+        return transcript
+
+    def transcribe_batch(
+            self, items, language=None, model='whisper-1', batch_size=8,
+            max_workers=4):
+        """Transcribe several audio files, batching decode where possible.
+
+        API-backend items run concurrently on a bounded thread pool:
+        the requests are network-bound and share the pooled HTTP
+        client, so N workers pipeline N uploads. The local backend
+        keeps items sequential and parallelizes within each file
+        instead (chunking and batched decode).
+
+        Args:
+            items: List of (key, audio_binary, filename) tuples
+            language: Language code hint (e.g., 'uk', 'en')
+            model: Whisper API model name (API backend only)
+            batch_size: Windows per forward pass (local backend only)
+            max_workers: Concurrent API requests (API backend only)
+
+        Returns:
+            list: (key, text, segments, error, elapsed) tuples, one per
+                item; segments is a list of (start_seconds, text) and
+                exactly one of text/error is set
+        """
+        if self.backend == 'openai' and len(items) > 1:
+            workers = min(max_workers, len(items))
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=workers) as pool:
+                futures = [
+                    pool.submit(
+                        self._transcribe_batch_item, item, language, model,
+                        batch_size)
+                    for item in items
+                ]
+                return [future.result() for future in futures]
+
+        return [
+            self._transcribe_batch_item(item, language, model, batch_size)
+            for item in items
+        ]
 
-        transcript = self.client.audio.transcriptions.create(
+    def _transcribe_batch_item(self, item, language, model, batch_size):
+        """Transcribe one batch item, capturing its error if any.
+
+        Args:
+            item: (key, audio_binary, filename) tuple
+            language: Language code hint
+            model: Whisper API model name (API backend only)
+            batch_size: Windows per forward pass (local backend only)
+
+        Returns:
+            tuple: (key, text, segments, error, elapsed)
+        """
+        key, audio_binary, filename = item
+        start_time = time.time()
+        try:
+            text, segments = self.transcribe_segments(
+                audio_binary, filename, language=language, model=model,
+                batch_size=batch_size)
+            return (key, text, segments, None, time.time() - start_time)
+        except Exception as e:
+            _logger.exception('Batch transcription failed: key=%s', key)
+            return (key, None, [], str(e), time.time() - start_time)
+
+    def transcribe_segments(
+            self, audio_binary, filename, language=None, model='whisper-1',
+            batch_size=8, max_workers=4):
+        """Transcribe one file, splitting long audio into parallel chunks.
+
+        Long files are cut at silent regions and the chunks are
+        transcribed concurrently, so a one-hour recording no longer
+        occupies a worker for an hour of wall time.
+
+        Args:
+            audio_binary: Binary audio data
+            filename: Original filename for MIME type detection
+            language: Language code hint (e.g., 'uk', 'en')
+            model: Whisper API model name (API backend only)
+            batch_size: Windows per forward pass (local backend only)
+            max_workers: Concurrent chunk transcriptions
+
+        Returns:
+            tuple: (text, segments) where segments is a list of
+                (start_seconds, text) in playback order
+        """
+        chunks = split_on_silence(audio_binary)
+        if len(chunks) <= 1:
+            if self.backend == 'openai':
+                # One verbose_json call yields text and timestamped
+                # segments together, so downstream consumers that need
+                # timestamps never re-submit the audio.
+                payload = self._transcribe_openai(
+                    audio_binary, filename, language, model,
+                    response_format='verbose_json')
+                text = (payload.get('text') or '').strip()
+                segments = [
+                    (segment['start'], segment['text'].strip())
+                    for segment in payload.get('segments') or []
+                ]
+                return text, segments or [(0.0, text)]
+            text = self._transcribe_one(
+                audio_binary, filename, language, model, batch_size)
+            return text, [(0.0, text)]
+
+        texts = [None] * len(chunks)
+        workers = min(max_workers, len(chunks))
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=workers) as pool:
+            futures = {
+                pool.submit(
+                    self._transcribe_one, chunk_binary, filename, language,
+                    model, batch_size): index
+                for index, (_start, chunk_binary) in enumerate(chunks)
+            }
+            for future in concurrent.futures.as_completed(futures):
+                texts[futures[future]] = future.result()
+
+        segments = [
+            (start, texts[index].strip())
+            for index, (start, _chunk) in enumerate(chunks)
+        ]
+        return '\n'.join(text for _start, text in segments), segments
+
+    def transcribe_streaming(
+            self, audio_binary, filename, language=None, model='whisper-1',
+            window_seconds=30.0, step_seconds=5.0, batch_size=8,
+            on_partial=None):
+        """Transcribe incrementally, emitting confirmed text as it grows.
+
+        Implements LocalAgreement-2: the decoder runs on a sliding
+        buffer that grows by ``step_seconds`` per round, and tokens are
+        only emitted once two consecutive rounds agree on them. When
+        the buffer reaches ``window_seconds`` the agreed hypothesis is
+        flushed and the buffer restarts after it, keeping each decode
+        bounded. Total work is higher than a single pass; the point is
+        that text reaches the caller every few seconds instead of at
+        the very end.
+
+        Args:
+            audio_binary: Binary audio data
+            filename: Original filename for MIME type detection
+            language: Language code hint (e.g., 'uk', 'en')
+            model: Whisper API model name (API backend only)
+            window_seconds: Maximum sliding buffer length
+            step_seconds: Buffer growth per decoding round
+            batch_size: Windows per forward pass (local backend only)
+            on_partial: Callable invoked with each newly confirmed text
+                fragment
+
+        Returns:
+            str: Full transcribed text
+        """
+        duration = probe_duration(audio_binary)
+        if not duration or duration <= window_seconds:
+            text = self._transcribe_one(
+                audio_binary, filename, language, model, batch_size)
+            if on_partial and text.strip():
+                on_partial(text.strip())
+            return text
+
+        committed = []
+        buffer_committed = 0
+        previous_tokens = []
+        window_start = 0.0
+        position = min(step_seconds, duration)
+
+        while True:
+            chunk = extract_chunk(
+                audio_binary, window_start, position - window_start)
+            hypothesis = self._transcribe_one(
+                chunk, filename, language, model, batch_size)
+            tokens = hypothesis.split()
+
+            agreed = self._agreed_prefix(previous_tokens, tokens)
+            confirmed = agreed[buffer_committed:]
+            if confirmed:
+                committed.extend(confirmed)
+                buffer_committed = len(agreed)
+                if on_partial:
+                    on_partial(' '.join(confirmed))
+            previous_tokens = tokens
+
+            if position >= duration:
+                # Flush whatever the final round produced.
+                tail = tokens[buffer_committed:]
+                if tail:
+                    committed.extend(tail)
+                    if on_partial:
+                        on_partial(' '.join(tail))
+                break
+
+            if position - window_start >= window_seconds:
+                # Buffer full: flush the current hypothesis and restart
+                # the window after it so each decode stays bounded.
+                tail = tokens[buffer_committed:]
+                if tail:
+                    committed.extend(tail)
+                    if on_partial:
+                        on_partial(' '.join(tail))
+                window_start = position
+                buffer_committed = 0
+                previous_tokens = []
+
+            position = min(position + step_seconds, duration)
+
+        return ' '.join(committed)
+
+    @staticmethod
+    def _agreed_prefix(previous_tokens, current_tokens):
+        """Return the longest common prefix of two token lists.
+
+        Args:
+            previous_tokens: Tokens from the previous decoding round
+            current_tokens: Tokens from the current decoding round
+
+        Returns:
+            list: Tokens both rounds agree on, in order
+        """
+        agreed = []
+        for previous, current in zip(previous_tokens, current_tokens):
+            if previous != current:
+                break
+            agreed.append(current)
+        return agreed
+
+    def _transcribe_one(
+            self, audio_binary, filename, language, model, batch_size):
+        """Transcribe a single audio buffer with the configured backend.
+
+        Args:
+            audio_binary: Binary audio data
+            filename: Original filename for MIME type detection
+            language: Language code hint
+            model: Whisper API model name (API backend only)
+            batch_size: Windows per forward pass (local backend only)
+
+        Returns:
+            str: Transcribed text
+        """
+        if self.backend == 'faster_whisper_local':
+            _model, pipeline = _get_local_replica(
+                self.model_size, self.compute_type)
+            segments, _info = pipeline.transcribe(
+                io.BytesIO(audio_binary),
+                language=language,
+                batch_size=batch_size,
+                **self._vad_arguments(),
+            )
+            return ''.join(segment.text for segment in segments)
+        return self._transcribe_openai(audio_binary, filename, language, model)
+
+    def _transcribe_openai(self, audio_binary, filename, language, model,
+                           response_format='text'):
+        """Transcribe via the OpenAI Whisper API.
+
+        Bytes are wrapped in a BytesIO so httpx streams the upload in
+        chunks instead of copying the whole payload into its request
+        buffer; file-like objects are passed through as-is.
+
+        Args:
+            audio_binary: Binary audio data or a file-like object
+            filename: Original filename for MIME type detection
+            language: Language code hint
+            model: Whisper API model name
+            response_format: 'text' (fast path) or 'verbose_json' for
+                segments, timestamps and confidence in one call
+
+        Returns:
+            str or dict: Transcribed text, or the verbose payload as a
+                dict when response_format is 'verbose_json'
+        """
+        if not hasattr(audio_binary, 'read') \
+                and len(audio_binary) > API_MAX_UPLOAD_BYTES:
+            raise ValueError(
+                'Audio file exceeds the %d MB Whisper API limit and could '
+                'not be split into chunks (is ffmpeg installed?)'
+                % (API_MAX_UPLOAD_BYTES // (1024 * 1024)))
+        mime_type = self._get_mime_type(filename)
+        stream = audio_binary if hasattr(audio_binary, 'read') \
+            else io.BytesIO(audio_binary)
+        response = self.client.audio.transcriptions.create(
             model=model,
-            file=(filename, audio_binary, mime_type),
+            file=(filename, stream, mime_type),
             language=language,
-            response_format='text',
+            response_format=response_format,
         )
+        if response_format == 'text':
+            return response
+        return response.model_dump()
 
-        _logger.info('Transcription completed: %d characters', len(transcript))
-        return transcript
+    def _transcribe_local(self, audio_binary, language):
+        """Transcribe with a local faster-whisper model.
 
-    def _get_mime_type(self, filename):
+        Args:
+            audio_binary: Binary audio data
+            language: Language code hint
+
+        Returns:
+            str: Transcribed text
+        """
+        model, _pipeline = _get_local_replica(
+            self.model_size, self.compute_type)
+        segments, _info = model.transcribe(
+            io.BytesIO(audio_binary),
+            language=language,
+            beam_size=5,
+            **self._vad_arguments(),
+        )
+        return ''.join(segment.text for segment in segments)
+
+    @staticmethod
+    def _get_mime_type(filename):
         """Determine MIME type from filename extension.
 
+        Only the extension is lowercased, avoiding a copy of the whole
+        filename on every call.
+
         Args:
             filename: Audio filename
 
         Returns:
             str: MIME type string
         """
-        extension = filename.lower().rsplit('.', 1)[-1]
-        return self.MIME_TYPES.get(extension, 'audio/mpeg')
+        extension = os.path.splitext(filename)[1][1:].lower()
+        return WhisperService.MIME_TYPES.get(extension, 'audio/mpeg')
@@ -26,17 +26,15 @@ class AudioUploadWizard(models.TransientModel):
         if not self.file_ids:
             raise UserError(_('Please add at least one audio file.'))
 
-        AudioTask = self.env['audio.task']
-        created_tasks = AudioTask
-
-        for line in self.file_ids:
-            task = AudioTask.create({
+        created_tasks = self.env['audio.task'].create([
+            {
                 'name': line.filename or 'Audio Task',
                 'audio_file': line.audio_file,
                 'audio_filename': line.filename,
-            })
-            task.action_add_to_queue()
-            created_tasks |= task
+            }
+            for line in self.file_ids
+        ])
+        created_tasks.action_add_to_queue()
 
         return {
             'type': 'ir.actions.act_window',